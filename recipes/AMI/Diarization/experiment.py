@@ -24,11 +24,11 @@ import torch
 import logging
 import pickle
 import json
-import glob
-import shutil
 import numpy as np
+import multiprocessing
 import speechbrain as sb
 from tqdm.contrib import tqdm
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from hyperpyyaml import load_hyperpyyaml
 from speechbrain.utils.distributed import run_on_main
 from speechbrain.processing.PLDA_LDA import StatObject_SB
@@ -44,6 +44,9 @@ logger = logging.getLogger(__name__)
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.dirname(current_dir))
 
+# `SPKR-INFO` lines of the reference RTTMs (split_type -> list), read only once.
+_SPKR_INFO_CACHE = {}
+
 
 try:
     import sklearn  # noqa F401
@@ -61,11 +64,20 @@ except ImportError:
 
 def compute_embeddings(wavs, lens):
     """Definition of the steps for computation of embeddings from the waveforms."""
-    with torch.no_grad():
-        wavs = wavs.to(run_opts["device"])
+    # Mixed precision is used for the embedding model only (--auto_mix_prec).
+    use_amp = run_opts.get("auto_mix_prec", False) and "cuda" in str(
+        run_opts["device"]
+    )
+
+    with torch.inference_mode():
+        wavs = wavs.to(run_opts["device"], non_blocking=True)
         feats = params["compute_features"](wavs)
         feats = params["mean_var_norm"](feats, lens)
-        emb = params["embedding_model"](feats, lens)
+        with torch.cuda.amp.autocast(enabled=use_amp):
+            emb = params["embedding_model"](feats, lens)
+
+        # Back to float32 so that clustering numerics are unchanged.
+        emb = emb.float()
         emb = params["mean_var_norm_emb"](
             emb, torch.ones(emb.shape[0], device=run_opts["device"])
         )
@@ -73,6 +85,122 @@ def compute_embeddings(wavs, lens):
     return emb
 
 
+def jit_example_inputs():
+    """Returns example inputs of the modules computing the embeddings, for two
+    different batch sizes and lengths (used to trace the modules and to check
+    that the traces do not depend on the input shapes).
+
+    Returns
+    -------
+    examples : dict
+        Module key -> list of input tuples.
+    """
+
+    device = run_opts["device"]
+    keys = ["compute_features", "mean_var_norm", "embedding_model"]
+    examples = {key: [] for key in keys}
+
+    with torch.no_grad():
+        for batch_size, n_samples in [(2, 16000), (3, 24000)]:
+            wavs = torch.randn(batch_size, n_samples, device=device)
+            lens = torch.linspace(1.0, 0.6, batch_size, device=device)
+            feats = params["compute_features"](wavs)
+            examples["compute_features"].append((wavs,))
+            examples["mean_var_norm"].append((feats.clone(), lens))
+            feats = params["mean_var_norm"](feats, lens)
+            examples["embedding_model"].append((feats, lens))
+
+    return examples
+
+
+def compile_jit_modules(module_keys):
+    """Compiles the requested modules with torch.jit.script (as done by the
+    `--jit_module_keys` option of sb.core.Brain). Modules that cannot be
+    scripted are traced with torch.jit.trace (if example inputs are known),
+    and only kept when the traces give the same outputs on another input
+    shape. Otherwise, they are kept in eager mode. With the provided hparams
+    files, only `compute_features` can be compiled (traced).
+
+    Arguments
+    ---------
+    module_keys : list
+        Keys (in params) of the modules to be compiled.
+    """
+
+    examples = jit_example_inputs()
+
+    for name in module_keys:
+        if name not in params:
+            raise ValueError(
+                "module " + name + " is not defined in your hparams file."
+            )
+        try:
+            module = torch.jit.script(params[name])
+        except Exception as e:
+            if name not in examples:
+                msg = "Cannot jit compile %s, using eager mode: %s" % (name, e)
+                logger.warning(msg)
+                continue
+            try:
+                with torch.no_grad():
+                    module = torch.jit.trace(
+                        params[name],
+                        examples[name][0],
+                        check_inputs=examples[name][1:],
+                    )
+            except Exception as e:
+                # The tracing errors include whole graphs: first line only.
+                msg = "Cannot jit trace %s, using eager mode: %s" % (
+                    name,
+                    str(e).splitlines()[0],
+                )
+                logger.warning(msg)
+                continue
+        params[name] = module.to(run_opts["device"])
+
+
+def init_clustering_worker(n_threads):
+    """Initializes a clustering process of the pool: the number of BLAS (and
+    torch) threads is capped so that the workers do not oversubscribe the cpu.
+
+    Arguments
+    ---------
+    n_threads : int
+        Number of threads used by each worker.
+    """
+
+    # threadpoolctl comes with scikit-learn.
+    from threadpoolctl import threadpool_limits
+
+    global _THREAD_LIMITS
+
+    torch.set_num_threads(n_threads)
+    _THREAD_LIMITS = threadpool_limits(limits=n_threads)
+
+
+def run_clustering(pending, backend_fn, *args, **kwargs):
+    """Runs a clustering backend on one recording. When a process pool is
+    available (see `clustering_workers`), the job is submitted to it and
+    the future is appended to `pending`; otherwise it runs right away.
+
+    Arguments
+    ---------
+    pending : list
+        Futures of the submitted clustering jobs.
+    backend_fn : function
+        Clustering backend (e.g., diar.do_spec_clustering).
+    *args
+        Positional arguments of backend_fn.
+    **kwargs
+        Keyword arguments of backend_fn.
+    """
+
+    if clustering_pool is None:
+        backend_fn(*args, **kwargs)
+    else:
+        pending.append(clustering_pool.submit(backend_fn, *args, **kwargs))
+
+
 def embedding_computation_loop(split, set_loader, stat_file):
     """Extracts embeddings for a given dataset loader."""
 
@@ -80,38 +208,52 @@ def embedding_computation_loop(split, set_loader, stat_file):
     # Extract embeddings (skip if already done).
     if not os.path.isfile(stat_file):
         logger.debug("Extracting deep embeddings and diarizing")
-        embeddings = np.empty(shape=[0, params["emb_dim"]], dtype=np.float64)
         modelset = []
         segset = []
 
         # Different data may have different statistics.
         params["mean_var_norm_emb"].count = 0
 
+        # Embeddings are copied batch by batch into a pre-allocated (pinned)
+        # host buffer, which is then shared with numpy without any copy.
+        use_cuda = "cuda" in str(run_opts["device"])
+        host_emb = torch.empty(
+            (len(set_loader.dataset), params["emb_dim"]),
+            dtype=torch.float32,
+            pin_memory=use_cuda,
+        )
+        offset = 0
+
         for batch in set_loader:
             ids = batch.id
             wavs, lens = batch.sig
 
-            mod = [x for x in ids]
-            seg = [x for x in ids]
-            modelset = modelset + mod
-            segset = segset + seg
+            modelset.extend(ids)
+            segset.extend(ids)
 
             # Embedding computation.
-            emb = (
-                compute_embeddings(wavs, lens)
-                .contiguous()
-                .squeeze(1)
-                .cpu()
-                .numpy()
+            emb = compute_embeddings(wavs, lens).squeeze(1)
+            batch_size = emb.shape[0]
+            host_emb[offset : offset + batch_size].copy_(
+                emb, non_blocking=use_cuda
             )
-            embeddings = np.concatenate((embeddings, emb), axis=0)
+            offset += batch_size
+
+        # Wait for the (asynchronous) device to host copies. The device is
+        # given explicitly since it may not be the current one (e.g., cuda:1).
+        if use_cuda:
+            torch.cuda.synchronize(run_opts["device"])
+        embeddings = host_emb[:offset].numpy()
+
+        # Clustering kernels (sklearn/BLAS) expect C-contiguous float32.
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
 
         modelset = np.array(modelset, dtype="|O")
         segset = np.array(segset, dtype="|O")
 
         # Intialize variables for start, stop and stat0.
-        s = np.array([None] * embeddings.shape[0])
-        b = np.array([[1.0]] * embeddings.shape[0])
+        s = np.full(embeddings.shape[0], None, dtype=object)
+        b = np.ones((embeddings.shape[0], 1), dtype=np.float32)
 
         stat_obj = StatObject_SB(
             modelset=modelset,
@@ -131,62 +273,90 @@ def embedding_computation_loop(split, set_loader, stat_file):
         with open(stat_file, "rb") as in_file:
             stat_obj = pickle.load(in_file)
 
+        # Previously saved embeddings may be in float64.
+        stat_obj.stat1 = np.require(
+            stat_obj.stat1, dtype=np.float32, requirements=["C", "A"]
+        )
+
     return stat_obj
 
 
-def prepare_subset_json(full_meta_data, rec_id, out_meta_file):
-    """Prepares metadata for a given recording ID.
+def group_meta_by_rec_id(full_meta_data):
+    """Splits the full metadata into one subset per recording ID, in a single
+    pass over the sub-segments (their IDs are prefixed by the recording ID).
 
     Arguments
     ---------
     full_meta_data : json
         Full meta (json) containing all the recordings
+
+    Returns
+    -------
+    meta_per_rec : dict
+        Recording IDs mapped to their subset of full_meta_data.
+    """
+
+    meta_per_rec = {}
+    for key in full_meta_data:
+        rec_id = str(key).split("_")[0]
+        if rec_id not in meta_per_rec:
+            meta_per_rec[rec_id] = {}
+        meta_per_rec[rec_id][key] = full_meta_data[key]
+
+    return meta_per_rec
+
+
+def prepare_subset_json(meta_per_rec, rec_id, out_meta_file):
+    """Prepares metadata for a given recording ID.
+
+    Arguments
+    ---------
+    meta_per_rec : dict
+        Metadata of all the recordings grouped by recording ID
+        (see group_meta_by_rec_id).
     rec_id : str
         The recording ID for which meta (json) has to be prepared
     out_meta_file : str
         Path of the output meta (json) file.
     """
 
-    subset = {}
-    for key in full_meta_data:
-        k = str(key)
-        if k.startswith(rec_id):
-            subset[key] = full_meta_data[key]
+    subset = meta_per_rec[rec_id]
 
+    # json.dumps (unlike json.dump) serializes with the (faster) C encoder
+    # when no indentation is requested.
     with open(out_meta_file, mode="w") as json_f:
-        json.dump(subset, json_f, indent=2)
-
+        json_f.write(json.dumps(subset))
 
-def diarize_dataset(full_meta, split_type, n_lambdas, pval, n_neighbors=10):
-    """This function diarizes all the recordings in a given dataset. It performs
-    computation of embedding and clusters them using spectral clustering (or other backends).
-    The output speaker boundary file is stored in the RTTM format.
-    """
 
-    # Prepare `spkr_info` only once when Oracle num of speakers is selected.
-    # spkr_info is essential to obtain number of speakers from groundtruth.
-    if params["oracle_n_spkrs"] is True:
-        full_ref_rttm_file = (
-            params["ref_rttm_dir"] + "/fullref_ami_" + split_type + ".rttm"
-        )
+def extract_all_embeddings(full_meta, split_type):
+    """Computes (or loads from cache) the embeddings of all the recordings in a
+    given dataset. This is the expensive part of diarization, so it is done only
+    once and reused by the clustering step (e.g., across the dev set tuners).
 
-        rttm = diar.read_rttm(full_ref_rttm_file)
+    Arguments
+    ---------
+    full_meta : dict
+        Full meta (json) containing all the recordings of the dataset.
+    split_type : str
+        Split of the dataset (dev or eval).
+
+    Returns
+    -------
+    diary_objs : dict
+        Recording IDs (sorted) mapped to their StatObject_SB embeddings.
+    """
 
-        spkr_info = list(  # noqa F841
-            filter(lambda x: x.startswith("SPKR-INFO"), rttm)
-        )
+    # Group the metadata by recording only once (instead of per recording).
+    meta_per_rec = group_meta_by_rec_id(full_meta)
 
     # Get all the recording IDs in this dataset.
-    all_keys = full_meta.keys()
-    A = [word.rstrip().split("_")[0] for word in all_keys]
-    all_rec_ids = list(set(A[1:]))
-    all_rec_ids.sort()
+    all_rec_ids = sorted(meta_per_rec)
     split = "AMI_" + split_type
     i = 1
 
     # Setting eval modality.
     params["embedding_model"].eval()
-    msg = "Diarizing " + split_type + " set"
+    msg = "Extracting embeddings for " + split_type + " set"
     logger.info(msg)
 
     if len(all_rec_ids) <= 0:
@@ -194,7 +364,13 @@ def diarize_dataset(full_meta, split_type, n_lambdas, pval, n_neighbors=10):
         logger.error(msg)
         sys.exit()
 
-    # Diarizing different recordings in a dataset.
+    # Embedding directory.
+    if not os.path.exists(os.path.join(params["embedding_dir"], split)):
+        os.makedirs(os.path.join(params["embedding_dir"], split))
+
+    diary_objs = {}
+
+    # Extracting embeddings of different recordings in a dataset.
     for rec_id in tqdm(all_rec_ids):
         # This tag will be displayed in the log.
         tag = (
@@ -209,13 +385,9 @@ def diarize_dataset(full_meta, split_type, n_lambdas, pval, n_neighbors=10):
         i = i + 1
 
         # Log message.
-        msg = "Diarizing %s : %s " % (tag, rec_id)
+        msg = "Extracting embeddings %s : %s " % (tag, rec_id)
         logger.debug(msg)
 
-        # Embedding directory.
-        if not os.path.exists(os.path.join(params["embedding_dir"], split)):
-            os.makedirs(os.path.join(params["embedding_dir"], split))
-
         # File to store embeddings.
         emb_file_name = rec_id + "." + params["mic_type"] + ".emb_stat.pkl"
         diary_stat_emb_file = os.path.join(
@@ -230,36 +402,85 @@ def diarize_dataset(full_meta, split_type, n_lambdas, pval, n_neighbors=10):
         )
 
         # Write subset (meta for one recording) json metadata.
-        prepare_subset_json(full_meta, rec_id, meta_per_rec_file)
+        prepare_subset_json(meta_per_rec, rec_id, meta_per_rec_file)
 
         # Prepare data loader.
         diary_set_loader = dataio_prep(params, meta_per_rec_file)
 
-        # Putting modules on the device.
-        params["compute_features"].to(run_opts["device"])
-        params["mean_var_norm"].to(run_opts["device"])
-        params["embedding_model"].to(run_opts["device"])
-        params["mean_var_norm_emb"].to(run_opts["device"])
-
         # Compute Embeddings.
-        diary_obj = embedding_computation_loop(
+        diary_objs[rec_id] = embedding_computation_loop(
             "diary", diary_set_loader, diary_stat_emb_file
         )
 
-        # Adding tag for directory path.
-        type_of_num_spkr = "oracle" if params["oracle_n_spkrs"] else "est"
-        tag = (
-            type_of_num_spkr
-            + "_"
-            + str(params["affinity"])
-            + "_"
-            + params["backend"]
-        )
-        out_rttm_dir = os.path.join(
-            params["sys_rttm_dir"], params["mic_type"], split, tag
-        )
-        if not os.path.exists(out_rttm_dir):
-            os.makedirs(out_rttm_dir)
+    return diary_objs
+
+
+def cluster_all(diary_objs, split_type, n_lambdas, pval, n_neighbors=10):
+    """Clusters the (already extracted) embeddings of all the recordings in a
+    given dataset using spectral clustering (or other backends).
+    The output speaker boundary file is stored in the RTTM format.
+
+    Arguments
+    ---------
+    diary_objs : dict
+        Recording IDs mapped to their StatObject_SB embeddings
+        (as returned by `extract_all_embeddings`).
+    split_type : str
+        Split of the dataset (dev or eval).
+    n_lambdas : int
+        Number of speakers (used for nn affinity with estimated num of speakers).
+    pval : float
+        p-value for pruning the affinity matrix (threshold for AHC).
+    n_neighbors : int
+        Number of neighbors for the nn affinity.
+
+    Returns
+    -------
+    concate_rttm_file : str
+        Path of the RTTM file containing the output of all the recordings.
+    """
+
+    # Prepare `spkr_info` only once when Oracle num of speakers is selected.
+    # spkr_info is essential to obtain number of speakers from groundtruth.
+    # It is cached, since the tuners cluster the same split many times.
+    if params["oracle_n_spkrs"] is True:
+        spkr_info = _SPKR_INFO_CACHE.get(split_type)
+        if spkr_info is None:
+            full_ref_rttm_file = (
+                params["ref_rttm_dir"] + "/fullref_ami_" + split_type + ".rttm"
+            )
+
+            rttm = diar.read_rttm(full_ref_rttm_file)
+
+            spkr_info = list(filter(lambda x: x.startswith("SPKR-INFO"), rttm))
+            _SPKR_INFO_CACHE[split_type] = spkr_info
+
+    split = "AMI_" + split_type
+    msg = "Diarizing " + split_type + " set"
+    logger.info(msg)
+
+    # Adding tag for directory path.
+    type_of_num_spkr = "oracle" if params["oracle_n_spkrs"] else "est"
+    tag = (
+        type_of_num_spkr
+        + "_"
+        + str(params["affinity"])
+        + "_"
+        + params["backend"]
+    )
+    out_rttm_dir = os.path.join(
+        params["sys_rttm_dir"], params["mic_type"], split, tag
+    )
+    if not os.path.exists(out_rttm_dir):
+        os.makedirs(out_rttm_dir)
+
+    # Recordings are clustered independently (in parallel with a process pool).
+    # Pool workers (if any) solve the eigendecomposition on cpu.
+    pending = []
+    eig_device = run_opts["device"] if clustering_pool is None else "cpu"
+
+    # Diarizing different recordings in a dataset.
+    for rec_id, diary_obj in diary_objs.items():
         out_rttm_file = out_rttm_dir + "/" + rec_id + ".rttm"
 
         # Processing starts from here.
@@ -276,13 +497,22 @@ def diarize_dataset(full_meta, split_type, n_lambdas, pval, n_neighbors=10):
                 num_spkrs = None
 
         if params["backend"] == "kmeans":
-            diar.do_kmeans_clustering(
-                diary_obj, out_rttm_file, rec_id, num_spkrs, pval,
+            run_clustering(
+                pending,
+                diar.do_kmeans_clustering,
+                diary_obj,
+                out_rttm_file,
+                rec_id,
+                num_spkrs,
+                pval,
+                random_state=params["seed"],
             )
 
         if params["backend"] == "SC":
             # Go for Spectral Clustering (SC).
-            diar.do_spec_clustering(
+            run_clustering(
+                pending,
+                diar.do_spec_clustering,
                 diary_obj,
                 out_rttm_file,
                 rec_id,
@@ -290,24 +520,53 @@ def diarize_dataset(full_meta, split_type, n_lambdas, pval, n_neighbors=10):
                 pval,
                 params["affinity"],
                 n_neighbors,
+                device=eig_device,
+                random_state=params["seed"],
+            )
+
+        if params["backend"] == "SC_nystrom":
+            # Approximate Spectral Clustering (for long recordings).
+            run_clustering(
+                pending,
+                diar.do_spec_clustering_nystrom,
+                diary_obj,
+                out_rttm_file,
+                rec_id,
+                num_spkrs,
+                max_num_spkrs=params["max_num_spkrs"],
+                random_state=params["seed"],
             )
 
         # Can used for AHC later. Likewise one can add different backends here.
         if params["backend"] == "AHC":
             # call AHC
             threshold = pval  # pval for AHC is nothing but threshold.
-            diar.do_AHC(diary_obj, out_rttm_file, rec_id, num_spkrs, threshold)
+            run_clustering(
+                pending,
+                diar.do_AHC,
+                diary_obj,
+                out_rttm_file,
+                rec_id,
+                num_spkrs,
+                threshold,
+            )
+
+    # Wait for all the RTTM files (and raise errors of the workers, if any).
+    for future in as_completed(pending):
+        future.result()
 
     # Once all RTTM outputs are generated, concatenate individual RTTM files to obtain single RTTM file.
     # This is not needed but just staying with the standards.
     concate_rttm_file = out_rttm_dir + "/sys_output.rttm"
     logger.debug("Concatenating individual RTTM files...")
-    with open(concate_rttm_file, "w") as cat_file:
-        for f in glob.glob(out_rttm_dir + "/*.rttm"):
-            if f == concate_rttm_file:
+    with open(concate_rttm_file, "wb") as cat_file:
+        for entry in os.scandir(out_rttm_dir):
+            if not entry.name.endswith(".rttm"):
+                continue
+            if entry.name == os.path.basename(concate_rttm_file):
                 continue
-            with open(f, "r") as indi_rttm_file:
-                shutil.copyfileobj(indi_rttm_file, cat_file)
+            with open(entry.path, "rb") as indi_rttm_file:
+                cat_file.write(indi_rttm_file.read())
 
     msg = "The system generated RTTM file for %s set : %s" % (
         split_type,
@@ -318,6 +577,17 @@ def diarize_dataset(full_meta, split_type, n_lambdas, pval, n_neighbors=10):
     return concate_rttm_file
 
 
+def diarize_dataset(full_meta, split_type, n_lambdas, pval, n_neighbors=10):
+    """This function diarizes all the recordings in a given dataset. It performs
+    computation of embedding and clusters them using spectral clustering (or other backends).
+    The output speaker boundary file is stored in the RTTM format.
+    """
+
+    diary_objs = extract_all_embeddings(full_meta, split_type)
+
+    return cluster_all(diary_objs, split_type, n_lambdas, pval, n_neighbors)
+
+
 def dev_pval_tuner(full_meta, split_type):
     """Tuning p_value for affinity matrix.
     The p_value used so that only p% of the values in each row is retained.
@@ -327,11 +597,13 @@ def dev_pval_tuner(full_meta, split_type):
     prange = np.arange(0.002, 0.015, 0.001)
 
     n_lambdas = None  # using it as flag later.
+
+    # Embeddings do not depend on p_v, so extract them only once.
+    diary_objs = extract_all_embeddings(full_meta, split_type)
+
     for p_v in prange:
         # Process whole dataset for value of p_v.
-        concate_rttm_file = diarize_dataset(
-            full_meta, split_type, n_lambdas, p_v
-        )
+        concate_rttm_file = cluster_all(diary_objs, split_type, n_lambdas, p_v)
 
         ref_rttm = os.path.join(params["ref_rttm_dir"], "fullref_ami_dev.rttm")
         sys_rttm = concate_rttm_file
@@ -363,12 +635,13 @@ def dev_ahc_threshold_tuner(full_meta, split_type):
 
     n_lambdas = None  # using it as flag later.
 
+    # Embeddings do not depend on the threshold, so extract them only once.
+    diary_objs = extract_all_embeddings(full_meta, split_type)
+
     # Note: p_val is threshold in case of AHC.
     for p_v in prange:
         # Process whole dataset for value of p_v.
-        concate_rttm_file = diarize_dataset(
-            full_meta, split_type, n_lambdas, p_v
-        )
+        concate_rttm_file = cluster_all(diary_objs, split_type, n_lambdas, p_v)
 
         ref_rttm = os.path.join(params["ref_rttm_dir"], "fullref_ami_dev.rttm")
         sys_rttm = concate_rttm_file
@@ -401,11 +674,14 @@ def dev_nn_tuner(full_meta, split_type):
     # Now assumming oracle num of speakers.
     n_lambdas = 4
 
+    # Embeddings do not depend on nn, so extract them only once.
+    diary_objs = extract_all_embeddings(full_meta, split_type)
+
     for nn in range(5, 15):
 
         # Process whole dataset for value of n_lambdas.
-        concate_rttm_file = diarize_dataset(
-            full_meta, split_type, n_lambdas, pval, nn
+        concate_rttm_file = cluster_all(
+            diary_objs, split_type, n_lambdas, pval, nn
         )
 
         ref_rttm = os.path.join(params["ref_rttm_dir"], "fullref_ami_dev.rttm")
@@ -436,12 +712,14 @@ def dev_tuner(full_meta, split_type):
 
     DER_list = []
     pval = None
+
+    # Embeddings do not depend on n_lambdas, so extract them only once.
+    diary_objs = extract_all_embeddings(full_meta, split_type)
+
     for n_lambdas in range(1, params["max_num_spkrs"] + 1):
 
         # Process whole dataset for value of n_lambdas.
-        concate_rttm_file = diarize_dataset(
-            full_meta, split_type, n_lambdas, pval
-        )
+        concate_rttm_file = cluster_all(diary_objs, split_type, n_lambdas, pval)
 
         ref_rttm = os.path.join(params["ref_rttm_dir"], "fullref_ami_dev.rttm")
         sys_rttm = concate_rttm_file
@@ -550,12 +828,54 @@ if __name__ == "__main__":  # noqa: C901
         if not os.path.exists(dir_):
             os.makedirs(dir_)
 
+    # Process pool to cluster the recordings in parallel (None: sequential).
+    # Workers solve the eigendecomposition on cpu, so by default the recordings
+    # are clustered sequentially when running on a GPU.
+    # "spawn" is used since forked workers cannot use a CUDA initialized parent.
+    n_cpus = os.cpu_count() or 1
+    n_workers = params["clustering_workers"]
+    if n_workers is None:
+        n_workers = 0 if "cuda" in str(run_opts["device"]) else n_cpus // 2
+    clustering_pool = None
+    if n_workers > 1:
+        clustering_pool = ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_clustering_worker,
+            initargs=(max(1, n_cpus // n_workers),),
+        )
+
     # We download the pretrained Model from HuggingFace (or elsewhere depending on
     # the path given in the YAML file).
     run_on_main(params["pretrainer"].collect_files)
     params["pretrainer"].load_collected(device=run_opts["device"])
     params["embedding_model"].eval()
+
+    # Putting modules on the device (only once, not for every recording).
+    params["compute_features"].to(run_opts["device"])
+    params["mean_var_norm"].to(run_opts["device"])
     params["embedding_model"].to(run_opts["device"])
+    params["mean_var_norm_emb"].to(run_opts["device"])
+
+    # Optionally jit compile modules (e.g., --jit_module_keys compute_features).
+    if "jit_module_keys" in run_opts:
+        compile_jit_modules(run_opts["jit_module_keys"])
+
+    # Alternatively, compile the embedding model with torch.compile (PyTorch 2.x).
+    # Shapes vary across batches: after a first recompilation, the compiled
+    # graph is made dynamic automatically (forcing dynamic=True fails to lower
+    # the ECAPA-TDNN padding).
+    if params["compile_embedding_model"]:
+        if hasattr(torch, "compile"):
+            params["embedding_model"] = torch.compile(
+                params["embedding_model"],
+                mode="reduce-overhead",
+                fullgraph=False,
+            )
+        else:
+            logger.warning(
+                "torch.compile requires PyTorch >= 2.0, using eager mode."
+            )
 
     # AMI Dev Set: Tune hyperparams on dev set.
     # Read the meta-data file for dev set generated during data_prep
@@ -589,6 +909,9 @@ if __name__ == "__main__":  # noqa: C901
         logger.info("Tuning for threshold-value for AHC")
         best_threshold = dev_ahc_threshold_tuner(full_meta, "dev")
         best_pval = best_threshold
+    elif params["backend"] == "SC_nystrom":
+        # No affinity pruning with Nystrom, so there is no p-value to tune.
+        logger.info("No tuning needed for SC_nystrom")
     else:
         # NN for unknown num of speakers (can be used in future)
         if params["oracle_n_spkrs"] is False:
@@ -670,3 +993,6 @@ if __name__ == "__main__":  # noqa: C901
         % (str(final_DERs["dev"]), str(final_DERs["eval"]))
     )
     logger.info(msg)
+
+    if clustering_pool is not None:
+        clustering_pool.shutdown()
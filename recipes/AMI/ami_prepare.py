@@ -20,6 +20,7 @@ from speechbrain.dataio.dataio import (
 
 logger = logging.getLogger(__name__)
 SAMPLERATE = 16000
+ARRAY1_MIC_SUFFIXES = [str(i + 1).zfill(2) + ".wav" for i in range(8)]
 
 
 def prepare_ami(
@@ -472,10 +473,10 @@ def prepare_metadata(
                 + "-"
             )
 
-            f = []  # adding all 8 mics
-            for i in range(8):
-                f.append(wav_file_base_path + str(i + 1).zfill(2) + ".wav")
-            audio_files_path_list = f
+            # adding all 8 mics
+            audio_files_path_list = [
+                wav_file_base_path + suffix for suffix in ARRAY1_MIC_SUFFIXES
+            ]
 
             # Note: key "files" with 's' is used for multi-mic
             json_dict[subsegment_ID] = {
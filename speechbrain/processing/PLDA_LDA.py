@@ -225,7 +225,8 @@ class StatObject_SB:
         vect_norm = numpy.clip(
             numpy.linalg.norm(self.stat1, axis=1), 1e-08, numpy.inf
         )
-        self.stat1 = (self.stat1.transpose() / vect_norm).transpose()
+        # Broadcasting (instead of transposing) keeps stat1 C-contiguous.
+        self.stat1 = self.stat1 / vect_norm[:, numpy.newaxis]
 
     def rotate_stat1(self, R):
         """Rotate first-order statistics by a right-product.
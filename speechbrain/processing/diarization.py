@@ -22,6 +22,7 @@ import csv
 import numbers
 import warnings
 import scipy
+import torch
 import pytest
 import numpy as np
 
@@ -699,7 +700,9 @@ class Spec_Cluster(SpectralClustering):
 
         # Perform spectral clustering on affinity matrix
         self.labels_ = spectral_clustering_sb(
-            self.affinity_matrix_, n_clusters=self.n_clusters,
+            self.affinity_matrix_,
+            n_clusters=self.n_clusters,
+            random_state=self.random_state,
         )
         return self
 
@@ -717,6 +720,20 @@ class Spec_Clust_unorm:
     Von Luxburg, U. A tutorial on spectral clustering. Stat Comput 17, 395–416 (2007).
     https://doi.org/10.1007/s11222-007-9033-z
 
+    Arguments
+    ---------
+    min_num_spkrs : int
+        Minimum number of speakers (when the number of speakers is estimated).
+    max_num_spkrs : int
+        Maximum number of speakers (when the number of speakers is estimated).
+    device : str
+        Device used for the eigendecomposition of the laplacian (e.g., "cuda:0").
+    min_gpu_size : int
+        Minimum number of samples for running the eigendecomposition on the GPU.
+        For smaller matrices the host-device copies dominate, so cpu is used.
+    random_state : int
+        Seed for kmeans (None: numpy global random state).
+
     Example
     -------
     >>> from speechbrain.processing import diarization as diar
@@ -775,10 +792,20 @@ class Spec_Clust_unorm:
     >>> # print(clust.labels_) # [0 0 0 2 2 2 1 1 1 1]
     """
 
-    def __init__(self, min_num_spkrs=2, max_num_spkrs=10):
+    def __init__(
+        self,
+        min_num_spkrs=2,
+        max_num_spkrs=10,
+        device="cpu",
+        min_gpu_size=500,
+        random_state=None,
+    ):
 
         self.min_num_spkrs = min_num_spkrs
         self.max_num_spkrs = max_num_spkrs
+        self.device = device
+        self.min_gpu_size = min_gpu_size
+        self.random_state = random_state
 
     def do_spec_clust(self, X, k_oracle, p_val):
         """Function for spectral clustering.
@@ -880,8 +907,10 @@ class Spec_Clust_unorm:
 
         M[np.diag_indices(M.shape[0])] = 0
         D = np.sum(np.abs(M), axis=1)
-        D = np.diag(D)
-        L = D - M
+
+        # L = diag(D) - M, without allocating the dense diagonal matrix.
+        L = np.subtract(0.0, M)
+        L[np.diag_indices(L.shape[0])] = D
         return L
 
     def get_spec_embs(self, L, k_oracle=4):
@@ -905,7 +934,20 @@ class Spec_Clust_unorm:
             number of speakers then returns k_oracle.
         """
 
-        lambdas, eig_vecs = scipy.linalg.eigh(L)
+        use_gpu = (
+            str(self.device).startswith("cuda")
+            and torch.cuda.is_available()
+            and L.shape[0] >= self.min_gpu_size
+        )
+
+        if use_gpu:
+            # Eigendecomposition on GPU (cuSOLVER) for large laplacians.
+            lambdas, eig_vecs = torch.linalg.eigh(
+                torch.as_tensor(L, device=self.device)
+            )
+            lambdas = lambdas.cpu().numpy()
+        else:
+            lambdas, eig_vecs = scipy.linalg.eigh(L)
 
         # if params["oracle_n_spkrs"] is True:
         if k_oracle is not None:
@@ -927,6 +969,9 @@ class Spec_Clust_unorm:
                 num_of_spk = self.min_num_spkrs
 
         emb = eig_vecs[:, 0:num_of_spk]
+        if use_gpu:
+            # Only the retained eigenvectors are copied back to the host.
+            emb = emb.cpu().numpy()
 
         return emb, num_of_spk
 
@@ -945,7 +990,7 @@ class Spec_Clust_unorm:
         self.labels_ : self
             Labels for each sample embedding.
         """
-        _, self.labels_, _ = k_means(emb, k)
+        _, self.labels_, _ = k_means(emb, k, random_state=self.random_state)
 
     def getEigenGaps(self, eig_vals):
         """Returns the difference (gaps) between the Eigen values.
@@ -974,7 +1019,15 @@ class Spec_Clust_unorm:
 
 
 def do_spec_clustering(
-    diary_obj, out_rttm_file, rec_id, k, pval, affinity_type, n_neighbors
+    diary_obj,
+    out_rttm_file,
+    rec_id,
+    k,
+    pval,
+    affinity_type,
+    n_neighbors,
+    device="cpu",
+    random_state=1234,
 ):
     """Performs spectral clustering on embeddings. This function calls specific
     clustering algorithms as per affinity.
@@ -993,10 +1046,21 @@ def do_spec_clustering(
         `pval` for prunning affinity matrix.
     affinity_type : str
         Type of similarity to be used to get affinity matrix (cos or nn).
+    n_neighbors : int
+        Number of neighbors for the nn affinity.
+    device : str
+        Device used for the eigendecomposition with cos affinity.
+    random_state : int
+        Seed for kmeans.
     """
 
     if affinity_type == "cos":
-        clust_obj = Spec_Clust_unorm(min_num_spkrs=2, max_num_spkrs=10)
+        clust_obj = Spec_Clust_unorm(
+            min_num_spkrs=2,
+            max_num_spkrs=10,
+            device=device,
+            random_state=random_state,
+        )
         k_oracle = k  # use it only when oracle num of speakers
         clust_obj.do_spec_clust(diary_obj.stat1, k_oracle, pval)
         labels = clust_obj.labels_
@@ -1004,7 +1068,7 @@ def do_spec_clustering(
         clust_obj = Spec_Cluster(
             n_clusters=k,
             assign_labels="kmeans",
-            random_state=1234,
+            random_state=random_state,
             affinity="nearest_neighbors",
         )
         clust_obj.perform_sc(diary_obj.stat1, n_neighbors)
@@ -1042,8 +1106,128 @@ def do_spec_clustering(
     write_rttm(lol, out_rttm_file)
 
 
+def do_spec_clustering_nystrom(
+    diary_obj,
+    out_rttm_file,
+    rec_id,
+    k,
+    n_landmarks=None,
+    max_num_spkrs=10,
+    random_state=1234,
+):
+    """Performs approximate spectral clustering on embeddings using the
+    Nystrom method: the affinity matrix is only computed against `n_landmarks`
+    sampled embeddings, which reduces the cost from O(N^3) to O(N s^2).
+    The affinity is based on cosine similarities, rescaled to [0, 1].
+
+    Arguments
+    ---------
+    diary_obj : StatObject_SB type
+        Contains embeddings in diary_obj.stat1 and segment IDs in diary_obj.segset.
+    out_rttm_file : str
+        Path of the output RTTM file.
+    rec_id : str
+        Recording ID for the recording under processing.
+    k : int
+        Number of speaker (None, if it has to be estimated).
+    n_landmarks : int
+        Number of sampled landmark embeddings (10 times the number of
+        speakers if None).
+    max_num_spkrs : int
+        Maximum number of speakers (when the number of speakers is estimated).
+    random_state : int
+        Seed used to sample the landmarks and for kmeans.
+
+    Reference
+    ---------
+    Fowlkes, C., Belongie, S., Chung, F., Malik, J. Spectral grouping using
+    the Nystrom method. IEEE TPAMI 26, 214–225 (2004).
+    https://doi.org/10.1109/TPAMI.2004.1262185
+    """
+
+    X = np.asarray(diary_obj.stat1, dtype=np.float64)
+    n_samples = X.shape[0]
+    random_state = _check_random_state(random_state)
+
+    if n_landmarks is None:
+        n_landmarks = 10 * (k if k is not None else max_num_spkrs)
+    n_landmarks = min(n_landmarks, n_samples)
+
+    # Cosine affinity (in [0, 1]) between all embeddings and the landmarks.
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    X = X / np.clip(norms, 1e-08, np.inf)
+    landmarks = random_state.choice(n_samples, n_landmarks, replace=False)
+    C = 0.5 * (1.0 + X @ X[landmarks].T)
+    W = C[landmarks]
+
+    # Pseudo inverse square root of W (W can be rank deficient).
+    w_vals, w_vecs = scipy.linalg.eigh(W)
+    keep = w_vals > 1e-10 * w_vals.max()
+    W_isqrt = (w_vecs[:, keep] / np.sqrt(w_vals[keep])) @ w_vecs[:, keep].T
+
+    # Approximate affinity A ~ U U^T, then normalize it as D^-1/2 A D^-1/2.
+    U = C @ W_isqrt
+    degrees = U @ (U.T @ np.ones(n_samples))
+    U = U / np.sqrt(np.clip(degrees, 1e-10, np.inf))[:, np.newaxis]
+
+    # Eigenvectors of U U^T (N x N) from the ones of U^T U (s x s).
+    lambdas, eig_vecs = scipy.linalg.eigh(U.T @ U)
+    lambdas, eig_vecs = lambdas[::-1], eig_vecs[:, ::-1]
+
+    if k is not None:
+        num_of_spk = k
+    else:
+        # Max eigen gap on the eigenvalues of the normalized laplacian.
+        clust_obj = Spec_Clust_unorm(
+            min_num_spkrs=2, max_num_spkrs=max_num_spkrs
+        )
+        lambda_gap_list = clust_obj.getEigenGaps(
+            (1.0 - lambdas)[1:max_num_spkrs]
+        )
+        num_of_spk = (np.argmax(lambda_gap_list) if lambda_gap_list else 0) + 2
+        num_of_spk = max(num_of_spk, clust_obj.min_num_spkrs)
+
+    num_of_spk = min(num_of_spk, n_landmarks)
+    lambdas = np.clip(lambdas[:num_of_spk], 1e-10, np.inf)
+    emb = (U @ eig_vecs[:, :num_of_spk]) / np.sqrt(lambdas)
+
+    # Row normalization before kmeans.
+    emb = emb / np.clip(np.linalg.norm(emb, axis=1, keepdims=True), 1e-10, None)
+    _, labels, _ = k_means(emb, num_of_spk, random_state=random_state)
+
+    # Convert labels to speaker boundaries
+    subseg_ids = diary_obj.segset
+    lol = []
+
+    for i in range(labels.shape[0]):
+        spkr_id = rec_id + "_" + str(labels[i])
+
+        sub_seg = subseg_ids[i]
+
+        splitted = sub_seg.rsplit("_", 2)
+        rec_id = str(splitted[0])
+        sseg_start = float(splitted[1])
+        sseg_end = float(splitted[2])
+
+        a = [rec_id, sseg_start, sseg_end, spkr_id]
+        lol.append(a)
+
+    # Sorting based on start time of sub-segment
+    lol.sort(key=lambda x: float(x[1]))
+
+    # Merge and split in 2 simple steps: (i) Merge sseg of same speakers then (ii) split different speakers
+    # Step 1: Merge adjacent sub-segments that belong to same speaker (or cluster)
+    lol = merge_ssegs_same_speaker(lol)
+
+    # Step 2: Distribute duration of adjacent overlapping sub-segments belonging to different speakers (or cluster)
+    # Taking mid-point as the splitting time location.
+    lol = distribute_overlap(lol)
+
+    write_rttm(lol, out_rttm_file)
+
+
 def do_kmeans_clustering(
-    diary_obj, out_rttm_file, rec_id, k_oracle=4, p_val=0.3
+    diary_obj, out_rttm_file, rec_id, k_oracle=4, p_val=0.3, random_state=1234
 ):
     """Performs kmeans clustering on embeddings.
 
@@ -1061,6 +1245,8 @@ def do_kmeans_clustering(
         `pval` for prunning affinity matrix. Used only when number of speakers
         are unknown. Note that this is just for experiment. Prefer Spectral clustering
         for better clustering results.
+    random_state : int
+        Seed for kmeans.
     """
 
     if k_oracle is not None:
@@ -1089,7 +1275,9 @@ def do_kmeans_clustering(
         _, num_of_spk = clust_obj.get_spec_embs(laplacian, k_oracle)
 
     # Perform kmeans directly on deep embeddings
-    _, labels, _ = k_means(diary_obj.stat1, num_of_spk)
+    _, labels, _ = k_means(
+        diary_obj.stat1, num_of_spk, random_state=random_state
+    )
 
     # Convert labels to speaker boundaries
     subseg_ids = diary_obj.segset
@@ -0,0 +1,145 @@
+import torch
+import pytest
+import numpy as np
+
+pytest.importorskip("sklearn")
+
+
+def _clustered_embeddings(n_per_spkr, n_spkrs, dim=32, seed=0):
+    """Well separated (random) speaker embeddings with their true labels."""
+    rng = np.random.RandomState(seed)
+    centers = 5.0 * rng.randn(n_spkrs, dim)
+    labels = np.repeat(np.arange(n_spkrs), n_per_spkr)
+    X = centers[labels] + 0.5 * rng.randn(labels.shape[0], dim)
+    return X.astype(np.float32), labels
+
+
+def _laplacian(clust, X, pval=0.3):
+    sim_mat = clust.get_sim_mat(X)
+    pruned_sim_mat = clust.p_pruning(sim_mat, pval)
+    sym_pruned_sim_mat = 0.5 * (pruned_sim_mat + pruned_sim_mat.T)
+    return clust.get_laplacian(sym_pruned_sim_mat)
+
+
+def test_spec_embs_cpu_matches_scipy():
+
+    from scipy.linalg import eigh
+    from sklearn.metrics import adjusted_rand_score
+    from speechbrain.processing.diarization import Spec_Clust_unorm
+
+    X, true_labels = _clustered_embeddings(20, 3)
+    L = _laplacian(Spec_Clust_unorm(), X)
+
+    # Reference: scipy eigendecomposition (behaviour without device).
+    _, ref_vecs = eigh(L)
+
+    # cpu device, and cuda device gated off by min_gpu_size.
+    for clust in [
+        Spec_Clust_unorm(device="cpu"),
+        Spec_Clust_unorm(device="cuda:0", min_gpu_size=10 ** 6),
+    ]:
+        emb, num_of_spk = clust.get_spec_embs(L.copy(), None)
+        assert isinstance(emb, np.ndarray)
+        assert num_of_spk == 3
+        assert np.allclose(emb, ref_vecs[:, :num_of_spk])
+
+        np.random.seed(1234)
+        clust.cluster_embs(emb, num_of_spk)
+        labels = clust.labels_
+        np.random.seed(1234)
+        clust.cluster_embs(ref_vecs[:, :num_of_spk], num_of_spk)
+        assert np.array_equal(labels, clust.labels_)
+        assert adjusted_rand_score(true_labels, labels) == 1.0
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="requires CUDA")
+def test_spec_embs_gpu_matches_scipy():
+
+    from scipy.linalg import eigh
+    from speechbrain.processing.diarization import Spec_Clust_unorm
+
+    X, _ = _clustered_embeddings(200, 3)
+    clust = Spec_Clust_unorm(device="cuda:0", min_gpu_size=500)
+    L = _laplacian(clust, X)
+
+    emb, num_of_spk = clust.get_spec_embs(L.copy(), None)
+    _, ref_vecs = eigh(L)
+    ref_emb = ref_vecs[:, :num_of_spk]
+
+    assert isinstance(emb, np.ndarray)
+    assert num_of_spk == 3
+    # Eigenvectors are defined up to a rotation: compare the projectors.
+    assert np.allclose(emb @ emb.T, ref_emb @ ref_emb.T, atol=1e-3)
+
+
+def _diary_obj(X):
+    """StatObject_SB of consecutive 1.5 s sub-segments of recording R1."""
+    from speechbrain.processing.PLDA_LDA import StatObject_SB
+
+    n = X.shape[0]
+    segset = np.array(
+        ["R1_%.2f_%.2f" % (1.5 * i, 1.5 * (i + 1)) for i in range(n)],
+        dtype="|O",
+    )
+    s = np.full(n, None, dtype=object)
+    return StatObject_SB(
+        modelset=segset,
+        segset=segset,
+        start=s,
+        stop=s,
+        stat0=np.ones((n, 1), dtype=np.float32),
+        stat1=X,
+    )
+
+
+def _rttm_speakers(rttm_file):
+    with open(rttm_file) as f:
+        return set(line.split()[7] for line in f if line.strip())
+
+
+def test_spec_clustering_nystrom(tmp_path):
+
+    from speechbrain.processing.diarization import do_spec_clustering_nystrom
+
+    # Estimated number of speakers on well separated clusters.
+    X, _ = _clustered_embeddings(40, 4)
+    out_rttm_file = str(tmp_path / "R1_est.rttm")
+    do_spec_clustering_nystrom(_diary_obj(X), out_rttm_file, "R1", None)
+    assert len(_rttm_speakers(out_rttm_file)) == 4
+    # Each speaker talks once: one merged segment per speaker.
+    with open(out_rttm_file) as f:
+        assert len(f.readlines()) == 4
+
+    # Less embeddings than landmarks (estimated and oracle k).
+    X, _ = _clustered_embeddings(10, 2)
+    for k in [None, 2]:
+        out_rttm_file = str(tmp_path / ("R1_small_%s.rttm" % k))
+        do_spec_clustering_nystrom(
+            _diary_obj(X), out_rttm_file, "R1", k, n_landmarks=100
+        )
+        assert len(_rttm_speakers(out_rttm_file)) == 2
+
+
+def test_clustering_random_state(tmp_path):
+
+    from speechbrain.processing.diarization import (
+        do_kmeans_clustering,
+        do_spec_clustering,
+    )
+
+    # Outputs must not depend on the numpy global random state (e.g., when
+    # the recordings are clustered in different processes).
+    X, _ = _clustered_embeddings(20, 4)
+    diary_obj = _diary_obj(X)
+    for name, cluster_fn, args in [
+        ("sc", do_spec_clustering, (None, 0.3, "cos", 10)),
+        ("kmeans", do_kmeans_clustering, (4, 0.3)),
+    ]:
+        rttms = []
+        for seed in [0, 1]:
+            np.random.seed(seed)
+            out_rttm_file = str(tmp_path / ("%s_%d.rttm" % (name, seed)))
+            cluster_fn(diary_obj, out_rttm_file, "R1", *args, random_state=5)
+            with open(out_rttm_file) as f:
+                rttms.append(f.read())
+        assert rttms[0] == rttms[1]